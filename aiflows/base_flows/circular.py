@@ -100,7 +100,7 @@ class CircularFlow(CompositeFlow):
         subflows: List[Flow],
     ):
         super().__init__(flow_config=flow_config, subflows=subflows)
-        if len(self.subflows) <= 0:
+        if not self.subflows:
             raise ValueError(f"Circular flow needs at least one subflow, currently has 0")
         self.topology = self.__set_up_topology()
 
@@ -227,29 +227,33 @@ class CircularFlow(CompositeFlow):
         :type max_rounds: Union[int, None]
         :return: The output data dictionary
         """
+        # bound once, the loop below runs for every node of every round
+        nodes = tuple(
+            (node.goal, node.input_interface, node.flow, node.output_interface, node.reset) for node in self.topology
+        )
+        call_flow_from_state = self._call_flow_from_state
+        state_update_dict = self._state_update_dict
+        early_exit = self._early_exit
+
         curr_round = 0
         while max_rounds is None or curr_round < max_rounds:
             curr_round += 1
-            for node in self.topology:
-                input_interface = node.input_interface
-                current_flow = node.flow
-                output_interface = node.output_interface
-
-                output_message, output_data = self._call_flow_from_state(
-                    goal=node.goal,
+            for goal, input_interface, current_flow, output_interface, reset in nodes:
+                output_message, output_data = call_flow_from_state(
+                    goal=goal,
                     input_interface=input_interface,
                     flow=current_flow,
                     output_interface=output_interface,
                 )
 
-                self._state_update_dict(update_data=output_data)
+                state_update_dict(update_data=output_data)
 
                 # ~~~ Check for end of interaction
-                if self._early_exit():
+                if early_exit():
                     log.info(f"[{self.flow_config['name']}] End of interaction detected")
                     return
 
-                if node.reset:
+                if reset:
                     current_flow.reset(full_reset=True, recursive=True, src_flow=self)
 
         self._on_reach_max_rounds()
@@ -3,6 +3,11 @@ from typing import Dict, Any
 import copy
 import yaml
 
+try:  # use the libyaml bindings when PyYAML was built with them
+    from yaml import CSafeLoader as SafeLoader, CDumper as Dumper
+except ImportError:
+    from yaml import SafeLoader, Dumper
+
 
 class FlowConfig:
     def __init__(
@@ -48,12 +53,12 @@ class FlowConfig:
     @classmethod
     def from_yaml(cls, path: str):
         with open(path, "r") as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
         cls.from_dict(config)
 
     def to_yaml(self, path: str):
         with open(path, "w") as f:
-            yaml.dump(self.to_dict(), f)
+            yaml.dump(self.to_dict(), f, Dumper=Dumper)
 
     def __getitem__(self, item):
         return getattr(self, item)
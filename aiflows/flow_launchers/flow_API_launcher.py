@@ -3,7 +3,7 @@ from abc import ABC
 import time
 from copy import deepcopy
 
-from typing import Any, List, Dict, Union, Optional, Tuple
+from typing import Any, List, Dict, Union, Optional, Tuple, Iterable, Iterator
 
 import hydra
 from omegaconf import DictConfig
@@ -107,6 +107,12 @@ class FlowLauncher(MultiThreadedAPILauncher):
                 break
             except Exception as e:
                 if fault_tolerant_mode:
+                    _error = str(e)
+                    if _attempt_idx == n_batch_retries:
+                        # last attempt, there is nothing to wait for
+                        log.error(f"[Problem `{sample['id']}`] Error {_attempt_idx} in running the flow: {e}.")
+                        break
+
                     log.error(
                         f"[Problem `{sample['id']}`] "
                         f"Error {_attempt_idx} in running the flow: {e}. "
@@ -114,7 +120,6 @@ class FlowLauncher(MultiThreadedAPILauncher):
                     )
                     _attempt_idx += 1
                     time.sleep(wait_time_between_retries)
-                    _error = str(e)
                 else:
                     raise e
 
@@ -263,3 +268,44 @@ class FlowLauncher(MultiThreadedAPILauncher):
         full_outputs = [{key: sample[key] for key in keys_to_write} for sample in data]
         human_readable_outputs = [sample["human_readable_outputs"] for sample in data]
         return full_outputs, human_readable_outputs
+
+    @classmethod
+    def launch_stream(
+        cls,
+        flow_with_interfaces: Dict[str, Any],
+        data: Union[Dict, Iterable[Dict]],
+        path_to_output_file: Optional[str] = None,
+    ) -> Iterator[Tuple[dict, list]]:
+        """Class method that, like `launch`, runs inference on the given data (no multithreading), but yields the outputs
+        one sample at a time. Each sample is written to the output file as soon as it is processed, so neither the
+        data nor the outputs need to be held in memory at once.
+
+        :param flow_with_interfaces: A dictionary containing the flow to run inference with and the input and output interfaces to use.
+        :type flow_with_interfaces: Dict[str, Any]
+        :param data: The data to run inference on (a sample or an iterable of samples, e.g. a generator).
+        :type data: Union[Dict, Iterable[Dict]]
+        :param path_to_output_file: A path to a file to write the outputs to.
+        :type path_to_output_file: Optional[str], optional
+        :return: An iterator over the (full output, human-readable outputs) of each sample.
+        :rtype: Iterator[Tuple[dict, list]]
+        """
+        flow = flow_with_interfaces["flow"]
+        input_interface = flow_with_interfaces.get("input_interface", None)
+        output_interface = flow_with_interfaces.get("output_interface", None)
+
+        if isinstance(data, dict):
+            data = [data]
+
+        flow.reset(full_reset=True, recursive=True)
+
+        keys_to_write = ["id", "inference_outputs", "error"]
+        for sample in data:
+            sample = cls.predict_batch(
+                flow=flow,
+                input_interface=input_interface,
+                output_interface=output_interface,
+                batch=[sample],
+                path_to_output_file=path_to_output_file,
+                keys_to_write=keys_to_write,
+            )[0]
+            yield {key: sample[key] for key in keys_to_write}, sample["human_readable_outputs"]
@@ -1,9 +1,14 @@
 import os
 import re
+import errno
+import stat
 import sys
 import shutil
-import inspect
-import filecmp
+import importlib
+import itertools
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 import threading
@@ -32,11 +37,26 @@ REVISION_FILE_HEADER = """\
 
 DEFAULT_REMOTE_REVISION = "main"
 NO_COMMIT_HASH = "NO_COMMIT_HASH"
-
+OVERWRITE_POLICIES = ("always", "never", "prompt")
+
+_HEADER_LINES = tuple(line.strip() for line in REVISION_FILE_HEADER.split("\n"))
+_SYNC_ROOT_RE = re.compile(r"^sync_root: (.+)$")
+_CACHE_ROOT_RE = re.compile(r"^cache_root: (.+)$")
+_FLOW_MOD_SPEC_RE = re.compile(r"^(.+)/(.+) (.+) (.+) -> _/(.+)$")
+_DEPENDENCY_URL_RE = re.compile(r"^(\w+)/(\w+)$")
+_NUMBER_PREFIXED_RE = re.compile(r"^\d+\w+$")
+_NON_WORD_CHAR_RE = re.compile(r"\W")
+_PYTHON_MODULE_NAME_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+# protects sys.path and the flow.mod summaries, syncing a module is protected by the lock of its repo
 _lock = threading.Lock()
+_repo_locks: Dict[str, threading.Lock] = {}
+_repo_locks_lock = threading.Lock()
+_prompt_lock = threading.Lock()
+_hf_api = HfApi()
 
 
-@dataclass
+@dataclass(slots=True)
 class FlowModuleSpec:
     """This class contains the flow module specification.
 
@@ -104,6 +124,8 @@ class FlowModuleSpecSummary:
     :type mods: List[FlowModuleSpec], optional
     """
 
+    __slots__ = ("_sync_root", "_cache_root", "_mods")
+
     def __init__(self, sync_root: str, cache_root: str, mods: List[FlowModuleSpec] = None) -> None:
         if mods is None:
             mods = []
@@ -172,53 +194,56 @@ class FlowModuleSpecSummary:
         :raises ValueError: If the flow module file is invalid.
         """
 
-        sync_root_pattern = re.compile(r"^sync_root: (.+)$")
-        cache_root_pattern = re.compile(r"^cache_root: (.+)$")
-        flow_mod_spec_pattern = re.compile(r"^(.+)/(.+) (.+) (.+) -> _/(.+)$")
         if not os.path.exists(file_path):
             return None
 
+        # flow.mod is tiny, read it at once instead of line by line
         with open(file_path, "r") as f:
-            # read header
-            for header_line in REVISION_FILE_HEADER.split("\n"):
-                if header_line.strip() != f.readline().strip():
-                    raise ValueError(f"Invalid flow module file {file_path}, header is corrupted")
-
-            sync_root_line = f.readline().strip()
-            sync_root_match = re.search(sync_root_pattern, sync_root_line)
-            if not sync_root_match:
-                raise ValueError(f"Invalid flow module file {file_path}, the first line must be `sync_root: xxxx`")
-            sync_root = sync_root_match.group(1)
-
-            cache_root_line = f.readline().strip()
-            cache_root_match = re.search(cache_root_pattern, cache_root_line)
-            if not cache_root_match:
-                raise ValueError(f"Invalid flow module file {file_path}, the second line must be `cache_root: xxxx`")
-            cache_root = cache_root_match.group(1)
-
-            mods = []
-            mod_line = f.readline().strip()
-            while mod_line:
-                flow_mod_spec_match = re.search(flow_mod_spec_pattern, mod_line)
-                if not flow_mod_spec_match:
-                    raise ValueError(
-                        f"Invalid flow module file {file_path}, line '{mod_line}' is not a valid flow module spec"
-                    )
+            lines = iter(f.read().splitlines())
+
+        # read header
+        if tuple(line.strip() for line in itertools.islice(lines, len(_HEADER_LINES))) != _HEADER_LINES:
+            raise ValueError(f"Invalid flow module file {file_path}, header is corrupted")
+
+        sync_root_line = next(lines, "").strip()
+        sync_root_match = _SYNC_ROOT_RE.match(sync_root_line)
+        if not sync_root_match:
+            raise ValueError(f"Invalid flow module file {file_path}, the first line must be `sync_root: xxxx`")
+        sync_root = sync_root_match.group(1)
+
+        cache_root_line = next(lines, "").strip()
+        cache_root_match = _CACHE_ROOT_RE.match(cache_root_line)
+        if not cache_root_match:
+            raise ValueError(f"Invalid flow module file {file_path}, the second line must be `cache_root: xxxx`")
+        cache_root = cache_root_match.group(1)
+
+        # the relative sync dirs are appended to this prefix instead of calling os.path.join for each module
+        sync_dir_prefix = sync_root.rstrip(os.sep) + os.sep
+        mods = []
+        for mod_line in lines:
+            mod_line = mod_line.strip()
+            if not mod_line:
+                break
+
+            flow_mod_spec_match = _FLOW_MOD_SPEC_RE.match(mod_line)
+            if not flow_mod_spec_match:
+                raise ValueError(
+                    f"Invalid flow module file {file_path}, line '{mod_line}' is not a valid flow module spec"
+                )
 
-                username, repo_name, revision, commit_hash, relative_sync_dir = flow_mod_spec_match.groups()
-                repo_id = f"{username}/{repo_name}"
-                sync_dir = os.path.join(sync_root, relative_sync_dir)
+            username, repo_name, revision, commit_hash, relative_sync_dir = flow_mod_spec_match.groups()
+            repo_id = f"{username}/{repo_name}"
+            sync_dir = sync_dir_prefix + relative_sync_dir
 
-                if not is_local_revision(revision):  # remote revision
-                    cache_dir = utils.build_hf_cache_path(repo_id, commit_hash, cache_root)
-                else:
-                    cache_dir = sync_dir
+            if not is_local_revision(revision):  # remote revision
+                cache_dir = utils.build_hf_cache_path(repo_id, commit_hash, cache_root)
+            else:
+                cache_dir = sync_dir
 
-                flow_mod_spec = FlowModuleSpec(repo_id, revision, commit_hash, cache_dir, sync_dir)
-                mods.append(flow_mod_spec)
-                mod_line = f.readline().strip()
+            flow_mod_spec = FlowModuleSpec(repo_id, revision, commit_hash, cache_dir, sync_dir)
+            mods.append(flow_mod_spec)
 
-            return FlowModuleSpecSummary(sync_root, cache_root, mods)
+        return FlowModuleSpecSummary(sync_root, cache_root, mods)
 
     def serialize(self) -> str:
         """Serializes the FlowModuleSpecSummary object.
@@ -226,16 +251,23 @@ class FlowModuleSpecSummary:
         :return: The serialized FlowModuleSpecSummary object.
         :rtype: str
         """
-        lines = []
-        lines.append(f"sync_root: {self._sync_root}")
-        lines.append(f"cache_root: {self._cache_root}")
+        return "\n".join(self._iter_lines())
 
-        for mod in self._mods.values():
-            lines.append(
-                f"{mod.repo_id} {mod.revision} {mod.commit_hash} -> _/{os.path.relpath(mod.sync_dir, self._sync_root)}"
-            )
+    def serialize_to(self, writer):
+        """Serializes the FlowModuleSpecSummary object line by line to a writer, without building the whole string.
+
+        :param writer: A text file-like object with a `writelines` method.
+        :type writer: TextIO
+        """
+        writer.writelines(f"{line}\n" for line in self._iter_lines())
 
-        return "\n".join(lines)
+    def _iter_lines(self):
+        """Yields the lines of the serialized FlowModuleSpecSummary object."""
+        yield f"sync_root: {self._sync_root}"
+        yield f"cache_root: {self._cache_root}"
+        for mod in self._mods.values():
+            relative_sync_dir = os.path.relpath(mod.sync_dir, self._sync_root)
+            yield f"{mod.repo_id} {mod.revision} {mod.commit_hash} -> _/{relative_sync_dir}"
 
     def __repr__(self) -> str:
         return f"~~~ FlowModuleSpecSummary ~~~\n{self.serialize()}"
@@ -244,6 +276,29 @@ class FlowModuleSpecSummary:
         return self.__repr__()
 
 
+def _lock_for(repo_id: str) -> threading.Lock:
+    """Returns the lock serializing the syncs of a repository (syncs of different repositories can run concurrently).
+
+    :param repo_id: The repository ID
+    :type repo_id: str
+    :return: The lock of the repository
+    :rtype: threading.Lock
+    """
+    with _repo_locks_lock:
+        return _repo_locks.setdefault(repo_id, threading.Lock())
+
+
+def _abs(path: str) -> str:
+    """Returns the absolute version of a path, without calling `os.path.abspath` if it is already absolute.
+
+    :param path: The path
+    :type path: str
+    :return: The absolute path
+    :rtype: str
+    """
+    return path if os.path.isabs(path) else os.path.abspath(path)
+
+
 def add_to_sys_path(path):
     """Adds a path to sys.path if it's not already there.
 
@@ -267,7 +322,7 @@ def _is_valid_python_module_name(name):
     :type name: str
     :return: True if the given name is a valid python module name, False otherwise
     """
-    return re.match(r"^[a-zA-Z_][a-zA-Z0-9_]*$", name) is not None
+    return _PYTHON_MODULE_NAME_RE.match(name) is not None
 
 
 def is_local_revision(legal_revision: str) -> bool:
@@ -299,17 +354,17 @@ def validate_and_augment_dependency(dependency: Dict[str, str], caller_module_na
     if "url" not in dependency:  # TODO(yeeef): url is not descriptive
         raise ValueError("dependency must have a `url` field")
 
-    match = re.search(r"^(\w+)/(\w+)$", dependency["url"])
+    match = _DEPENDENCY_URL_RE.match(dependency["url"])
     if not match:
         raise ValueError("dependency url must be in the format of `username/repo_name`(huggingface repo)")
     username, repo_name = match.group(1), match.group(2)
 
-    if re.search(r"^\d+\w+$", repo_name):  # repo_name is prefixed with a number
+    if _NUMBER_PREFIXED_RE.match(repo_name):  # repo_name is prefixed with a number
         raise ValueError(
             f"url's repo name `{repo_name}` is prefixed with a number, which is illegal in Flows, please adjust your repo name"
         )
 
-    if re.search(r"^\d+\w+$", username):  # username is prefixed with a number
+    if _NUMBER_PREFIXED_RE.match(username):  # username is prefixed with a number
 
         logger.warning(
             f"[{caller_module_name}] url's username `{username}` is prefixed with a number, which is not a valid python module name, the module will be synced to ./flow_modules/user_{username}.{repo_name}, please import it as `import flow_modules.user_{username}.{repo_name}`"
@@ -323,7 +378,7 @@ def validate_and_augment_dependency(dependency: Dict[str, str], caller_module_na
     dep_is_local = False
 
     if not os.path.exists(revision):  # remote revision
-        match = re.search(r"\W", revision)  # ToDo (Martin): This often fails with a cryptic error message
+        match = _NON_WORD_CHAR_RE.search(revision)  # ToDo (Martin): This often fails with a cryptic error message
         if match is not None:
             raise ValueError(
                 f"{revision} is identified as remote, as it does not exist locally. But it not a valid remote revision, it contains illegal characters: {match.group(0)}"
@@ -356,11 +411,14 @@ def write_or_append_gitignore(sync_dir: str, mode: str, content: str):
 
     if os.path.exists(gitignore_path):
         with open(gitignore_path, "r") as gitignore_f:
-            if content in gitignore_f.read():
+            if content in (line.strip() for line in gitignore_f.read().splitlines()):
                 return
 
     with open(gitignore_path, mode) as gitignore_f:
-        lines = ["\n\n\n# auto-generated by aiflows, all synced modules will be ignored by default\n", f"{content}\n"]
+        lines = [
+            "\n\n\n# auto-generated by aiflows, all synced modules will be ignored by default\n",
+            f"{content}\n",
+        ]
         gitignore_f.writelines(lines)
 
 
@@ -392,6 +450,70 @@ def remove_dir_or_link(sync_dir: str):
 # # TODO(Yeeef): add repo_hash and modified_flag to decrease computing
 
 
+def _copy_file(src: str, dst: str) -> str:
+    """Copies a file and its metadata like `shutil.copy2`, but lets the kernel copy the data with
+    `os.copy_file_range` when possible (a reflink on copy-on-write filesystems). Hardlinks are not used on purpose:
+    editing a synced file in place would also modify the cache.
+
+    :param src: The source file
+    :type src: str
+    :param dst: The destination file
+    :type dst: str
+    :return: The destination file
+    :rtype: str
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            shutil.copystat(src, dst)
+            return dst
+        except OSError as e:
+            # e.g. cross-device copy on older kernels or unsupported filesystem
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM):
+                raise
+
+    return shutil.copy2(src, dst)
+
+
+def _can_prompt_user() -> bool:
+    """Returns True if the user can answer questions asked with `input()`, i.e. when stdin is a terminal or when running
+    in a Jupyter/IPython kernel (whose stdin is not a terminal, but forwards `input()` to the frontend).
+
+    :return: True if the user can be prompted, False otherwise
+    :rtype: bool
+    """
+    if "ipykernel" in sys.modules:
+        return True
+    return sys.stdin is not None and sys.stdin.isatty()
+
+
+def _ask_user(question: str, overwrite_policy: str = "prompt") -> str:
+    """Logs a question and reads the answer of the user. Questions asked by concurrent syncs are serialized.
+    With the "always" or "never" overwrite policy, the question is answered without prompting.
+
+    :param question: The question to ask
+    :type question: str
+    :param overwrite_policy: One of "always", "never" or "prompt". Defaults to "prompt".
+    :type overwrite_policy: str
+    :return: The answer of the user
+    :rtype: str
+    """
+    if overwrite_policy == "always":
+        return "Y"
+    if overwrite_policy == "never":
+        return "N"
+
+    with _prompt_lock:
+        logger.warn(question)
+        return input()
+
+
 def fetch_remote(repo_id: str, revision: str, sync_dir: str, cache_root: str) -> FlowModuleSpec:
     """Fetches a remote dependency.
 
@@ -406,18 +528,18 @@ def fetch_remote(repo_id: str, revision: str, sync_dir: str, cache_root: str) ->
     :return: The flow module specification
     :rtype: FlowModuleSpec
     """
-    sync_dir = os.path.abspath(sync_dir)
+    sync_dir = _abs(sync_dir)
     if is_local_sync_dir_valid(sync_dir):
         remove_dir_or_link(sync_dir)
 
     os.makedirs(os.path.dirname(sync_dir), exist_ok=True)
     create_init_py(os.path.dirname(sync_dir))
 
-    # this call is only used to download the repo to cache and get cache path
+    # download the repo to cache (no-op if the snapshot is already cached) and get cache path
     cache_mod_dir = huggingface_hub.snapshot_download(repo_id, cache_dir=cache_root, revision=revision)
 
-    # this call will fetch the cached snapshot to the sync_dir
-    huggingface_hub.snapshot_download(repo_id, cache_dir=cache_root, local_dir=sync_dir, revision=revision)
+    # materialize the cached snapshot in the sync_dir, snapshot entries are symlinks to blobs so we copy their content
+    shutil.copytree(cache_mod_dir, sync_dir, symlinks=False, copy_function=_copy_file, dirs_exist_ok=True)
 
     commit_hash = extract_commit_hash_from_cache_mod_dir(cache_mod_dir)
 
@@ -439,7 +561,7 @@ def fetch_local(repo_id: str, file_path: str, sync_dir: str) -> FlowModuleSpec:
     :rtype: FlowModuleSpec
     """
     # shutil.copytree(file_path, sync_dir, ignore=shutil.ignore_patterns(".git"), dirs_exist_ok=overwrite)
-    sync_dir = os.path.abspath(sync_dir)
+    sync_dir = _abs(sync_dir)
     # when fetch_local is triggered, the old dir is always going to be removed
     if is_local_sync_dir_valid(sync_dir):
         remove_dir_or_link(sync_dir)
@@ -458,7 +580,15 @@ def is_local_sync_dir_valid(sync_dir: str):
     :param sync_dir: The sync directory
     :type sync_dir: str
     """
-    return os.path.isdir(sync_dir) or os.path.islink(sync_dir)
+    # single lstat instead of os.path.isdir + os.path.islink
+    try:
+        sync_dir_stat = os.lstat(sync_dir)
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+    if stat.S_ISDIR(sync_dir_stat.st_mode) or stat.S_ISLNK(sync_dir_stat.st_mode):
+        return True
+    return False
 
 
 def retrive_commit_hash_from_remote(repo_id: str, revision: str) -> str:
@@ -471,8 +601,7 @@ def retrive_commit_hash_from_remote(repo_id: str, revision: str) -> str:
     :return: The commit hash
     :rtype: str
     """
-    hf_api = HfApi()
-    repo_info = hf_api.repo_info(repo_id=repo_id, repo_type="model", revision=revision, token=None)
+    repo_info = _hf_api.repo_info(repo_id=repo_id, repo_type="model", revision=revision, token=None)
     commit_hash = repo_info.sha
     return commit_hash
 
@@ -488,6 +617,110 @@ def extract_commit_hash_from_cache_mod_dir(cache_mod_dir: str) -> str:
     return os.path.basename(cache_mod_dir)
 
 
+def _hf_blob_digest(cache_file: str) -> Optional[Tuple[str, str]]:
+    """Returns the content digest of a file of the huggingface cache, None if it is unknown.
+    Snapshot files are symlinks to blobs named after their content hash: sha256 for LFS files and
+    git blob sha1 for regular files.
+
+    :param cache_file: The file in the cache directory
+    :type cache_file: str
+    :return: The hash algorithm ("sha256" or "git-sha1") and the hex digest, or None
+    :rtype: Optional[Tuple[str, str]]
+    """
+    if not os.path.islink(cache_file):
+        return None
+
+    blob_name = os.path.basename(os.readlink(cache_file))
+    if not all(c in "0123456789abcdef" for c in blob_name):
+        return None
+    if len(blob_name) == 64:
+        return "sha256", blob_name
+    if len(blob_name) == 40:
+        return "git-sha1", blob_name
+    return None
+
+
+def _file_digest(file_path: str, algorithm: str, file_size: int) -> str:
+    """Computes the content digest of a file, as used to name the huggingface cache blobs.
+
+    :param file_path: The path to the file
+    :type file_path: str
+    :param algorithm: The hash algorithm, "sha256" or "git-sha1"
+    :type algorithm: str
+    :param file_size: The size of the file (part of the git blob header)
+    :type file_size: int
+    :return: The hex digest
+    :rtype: str
+    """
+    if algorithm == "sha256":
+        file_hash = hashlib.sha256()
+    else:
+        file_hash = hashlib.sha1()
+        file_hash.update(f"blob {file_size}\0".encode())
+
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def _is_same_content(file_path_a: str, file_path_b: str, buffer_size: int = 1 << 16) -> bool:
+    """Compares the content of two files chunk by chunk, stopping at the first difference.
+
+    :param file_path_a: The path to the first file
+    :type file_path_a: str
+    :param file_path_b: The path to the second file
+    :type file_path_b: str
+    :param buffer_size: The size of the chunks read from each file. Defaults to 64KB.
+    :type buffer_size: int
+    :return: True if both files have the same content, False otherwise
+    :rtype: bool
+    """
+    with open(file_path_a, "rb") as fa, open(file_path_b, "rb") as fb:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fa.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fb.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+        while True:
+            chunk_a, chunk_b = fa.read(buffer_size), fb.read(buffer_size)
+            if chunk_a != chunk_b:
+                return False
+            if not chunk_a:
+                return True
+
+
+def _is_same_file(cache_file: str, sync_file: str) -> bool:
+    """Returns True if both files have the same content, False otherwise.
+    Files synced by `fetch_remote` keep the modification time of the cache, so the content is only
+    compared when sizes match but modification times differ.
+
+    :param cache_file: The file in the cache directory
+    :type cache_file: str
+    :param sync_file: The file in the sync directory
+    :type sync_file: str
+    :return: True if both files have the same content, False otherwise (e.g. the synced file was deleted)
+    :rtype: bool
+    """
+    cache_stat = os.stat(cache_file)
+    try:
+        sync_stat = os.stat(sync_file)
+    except FileNotFoundError:
+        return False
+
+    if cache_stat.st_size != sync_stat.st_size:
+        return False
+    if cache_stat.st_mtime_ns == sync_stat.st_mtime_ns:
+        return True
+
+    # the cache side is content-addressed, only the synced file needs to be read
+    blob_digest = _hf_blob_digest(cache_file)
+    if blob_digest is not None:
+        algorithm, digest = blob_digest
+        return _file_digest(sync_file, algorithm, sync_stat.st_size) == digest
+
+    return _is_same_content(cache_file, sync_file)
+
+
 def is_sync_dir_modified(sync_dir: str, cache_dir: str) -> bool:
     """Returns True if the sync_dir is modified compared to the cache_dir, False otherwise.
 
@@ -498,29 +731,42 @@ def is_sync_dir_modified(sync_dir: str, cache_dir: str) -> bool:
     :return: True if the sync_dir is modified compared to the cache_dir, False otherwise
     :rtype: bool
     """
-    with os.scandir(cache_dir) as it:
-        for entry in it:
-            # TODO(Yeeef): remove `entry.name.startswith('.')`
-            if entry.name.startswith(".") or entry.name == "__pycache__":
-                continue
-
-            if entry.is_file():
-                same = filecmp.cmp(
-                    os.path.join(cache_dir, entry.name), os.path.join(sync_dir, entry.name), shallow=False
-                )
-                if not same:
-                    logger.debug(
-                        f"File {os.path.join(cache_dir, entry.name)} is not the same as {os.path.join(sync_dir, entry.name)}"
-                    )
-                    return True
-            elif entry.is_dir():
-                dir_same = is_sync_dir_modified(os.path.join(sync_dir, entry.name), os.path.join(cache_dir, entry.name))
-                if not dir_same:
+    files_to_compare = []
+    dirs_to_visit = deque([(sync_dir, cache_dir)])
+    while dirs_to_visit:
+        sync_walk_dir, cache_walk_dir = dirs_to_visit.pop()
+        with os.scandir(cache_walk_dir) as it:
+            for entry in it:
+                # TODO(Yeeef): remove `entry.name.startswith('.')`
+                if entry.name.startswith(".") or entry.name == "__pycache__":
+                    continue
+
+                if entry.is_file():
+                    files_to_compare.append((entry.path, f"{sync_walk_dir}{os.sep}{entry.name}"))
+                elif entry.is_dir():
+                    dirs_to_visit.append((f"{sync_walk_dir}{os.sep}{entry.name}", entry.path))
+                else:
+                    raise ValueError(f"Invalid file: {entry.path}, it is not file or dir or valid symlink")
+
+    if not files_to_compare:
+        return False
+
+    # the byte-wise comparisons are I/O bound, overlap them and stop at the first difference
+    with ThreadPoolExecutor(max_workers=min(16, len(files_to_compare))) as executor:
+        futures = {
+            executor.submit(_is_same_file, cache_file, sync_file): (cache_file, sync_file)
+            for cache_file, sync_file in files_to_compare
+        }
+        not_done = set(futures)
+        while not_done:
+            done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+            for future in done:
+                if not future.result():
+                    cache_file, sync_file = futures[future]
+                    logger.debug(f"File {cache_file} is not the same as {sync_file}")
+                    for pending_future in not_done:
+                        pending_future.cancel()
                     return True
-            else:
-                raise ValueError(
-                    f"Invalid file: {os.path.join(cache_dir, entry.name)}, it is not file or dir or valid symlink"
-                )
 
     return False
 
@@ -534,6 +780,7 @@ def sync_remote_dep(
     sync_root: str,
     cache_root: str = DEFAULT_CACHE_PATH,
     overwrite: bool = False,
+    overwrite_policy: str = "prompt",
 ) -> FlowModuleSpec:
     """
     Synchronizes a remote dependency.
@@ -552,12 +799,14 @@ def sync_remote_dep(
     :type cache_root: str
     :param overwrite: Whether to overwrite the existing module or not. Defaults to False.
     :type overwrite: bool
+    :param overwrite_policy: How overwrite questions are answered, one of "always", "never" or "prompt". Defaults to "prompt".
+    :type overwrite_policy: str
     :return: The synced flow module specification.
     :rtype: FlowModuleSpec
     """
     synced_flow_mod_spec = None
     flow_mod_id = FlowModuleSpec.build_mod_id(repo_id, revision)
-    sync_dir = os.path.abspath(os.path.join(sync_root, mod_name))
+    sync_dir = _abs(os.path.join(sync_root, mod_name))
 
     if previous_synced_flow_mod_spec is None:  # directly sync without any warning
         logger.info(f"{flow_mod_id} will be fetched from remote")
@@ -576,10 +825,10 @@ def sync_remote_dep(
     sync_dir_modified = is_sync_dir_modified(sync_dir, previous_synced_flow_mod_spec.cache_dir)
 
     if overwrite:
-        logger.warn(
-            f"{colorama.Fore.RED}[{caller_module_name}] {flow_mod_id} will be overwritten, are you sure? (Y/N){colorama.Style.RESET_ALL}"
+        user_input = _ask_user(
+            f"{colorama.Fore.RED}[{caller_module_name}] {flow_mod_id} will be overwritten, are you sure? (Y/N){colorama.Style.RESET_ALL}",
+            overwrite_policy,
         )
-        user_input = input()
         if user_input != "Y":
             logger.warn(
                 f"{colorama.Fore.RED}[{caller_module_name}] {flow_mod_id} will not be overwritten.{colorama.Style.RESET_ALL}"
@@ -591,10 +840,10 @@ def sync_remote_dep(
             synced_flow_mod_spec = fetch_remote(repo_id, revision, sync_dir, cache_root)
     elif previous_synced_flow_mod_spec.mod_id != flow_mod_id:
         # user has supplied a new flow_mod_id, we fetch the remote directly with warning
-        logger.warn(
-            f"{colorama.Fore.RED}[{caller_module_name}] {previous_synced_flow_mod_spec.mod_id} already synced, it will be overwritten by new revision {flow_mod_id}, are you sure? (Y/N){colorama.Style.RESET_ALL}"
+        user_input = _ask_user(
+            f"{colorama.Fore.RED}[{caller_module_name}] {previous_synced_flow_mod_spec.mod_id} already synced, it will be overwritten by new revision {flow_mod_id}, are you sure? (Y/N){colorama.Style.RESET_ALL}",
+            overwrite_policy,
         )
-        user_input = input()
         if user_input != "Y":
             logger.warn(
                 f"{colorama.Fore.RED}[{caller_module_name}] {flow_mod_id} will not be overwritten.{colorama.Style.RESET_ALL}"
@@ -631,6 +880,7 @@ def sync_local_dep(
     caller_module_name: str,
     sync_root: str,
     overwrite: bool = False,
+    overwrite_policy: str = "prompt",
 ) -> FlowModuleSpec:
     """
     Synchronize a local dependency.
@@ -647,6 +897,8 @@ def sync_local_dep(
     :type caller_module_name: str
     :param overwrite: Whether to overwrite the previously synced flow module specification. Defaults to False.
     :type overwrite: bool
+    :param overwrite_policy: How overwrite questions are answered, one of "always", "never" or "prompt". Defaults to "prompt".
+    :type overwrite_policy: str
     :return: The synced flow module specification.
     :rtype: FlowModuleSpec
     """
@@ -654,7 +906,7 @@ def sync_local_dep(
     synced_flow_mod_spec = None
     flow_mod_id = FlowModuleSpec.build_mod_id(repo_id, revision)
     module_synced_from_dir = revision
-    sync_dir = os.path.abspath(os.path.join(sync_root, mod_name))
+    sync_dir = _abs(os.path.join(sync_root, mod_name))
 
     if not os.path.isdir(module_synced_from_dir):
         raise ValueError(
@@ -670,10 +922,10 @@ def sync_local_dep(
     assert sync_dir == previous_synced_flow_mod_spec.sync_dir, (sync_dir, previous_synced_flow_mod_spec.sync_dir)
 
     if overwrite:
-        logger.warn(
-            f"{colorama.Fore.RED}[{caller_module_name}] {flow_mod_id} will be overwritten, are you sure? (Y/N){colorama.Style.RESET_ALL}"
+        user_input = _ask_user(
+            f"{colorama.Fore.RED}[{caller_module_name}] {flow_mod_id} will be overwritten, are you sure? (Y/N){colorama.Style.RESET_ALL}",
+            overwrite_policy,
         )
-        user_input = input()
         if user_input != "Y":
             logger.warn(
                 f"{colorama.Fore.RED}[{caller_module_name}] {flow_mod_id} will not be overwritten.{colorama.Style.RESET_ALL}"
@@ -685,10 +937,10 @@ def sync_local_dep(
             synced_flow_mod_spec = fetch_local(repo_id, module_synced_from_dir, sync_dir)
 
     elif previous_synced_flow_mod_spec.mod_id != flow_mod_id:
-        logger.warn(
-            f"{colorama.Fore.RED}[{caller_module_name}] {previous_synced_flow_mod_spec.mod_id} already synced, it will be overwritten by {flow_mod_id}, are you sure? (Y/N){colorama.Style.RESET_ALL}"
+        user_input = _ask_user(
+            f"{colorama.Fore.RED}[{caller_module_name}] {previous_synced_flow_mod_spec.mod_id} already synced, it will be overwritten by {flow_mod_id}, are you sure? (Y/N){colorama.Style.RESET_ALL}",
+            overwrite_policy,
         )
-        user_input = input()
         if user_input != "Y":
             logger.warn(
                 f"{colorama.Fore.RED}[{caller_module_name}] {previous_synced_flow_mod_spec.mod_id} will not be overwritten.{colorama.Style.RESET_ALL}"
@@ -739,10 +991,8 @@ def write_flow_mod_summary(flow_mod_summary_path: str, flow_mod_summary: FlowMod
     :type flow_mod_summary: FlowModuleSpecSummary
     """
     with open(flow_mod_summary_path, "w") as f:
-        f.write(REVISION_FILE_HEADER)
-        f.write("\n")
-        f.write(flow_mod_summary.serialize())
-        f.write("\n")
+        f.write(f"{REVISION_FILE_HEADER}\n")
+        flow_mod_summary.serialize_to(f)
 
 
 def _sync_dependencies(
@@ -751,6 +1001,7 @@ def _sync_dependencies(
     flow_modules_base_dir: str,
     cache_root: str,
     caller_module_name: str,
+    overwrite_policy: Optional[str] = "prompt",
 ) -> FlowModuleSpecSummary:
     """Synchronizes dependencies.
 
@@ -764,87 +1015,151 @@ def _sync_dependencies(
     :type cache_root: str
     :param caller_module_name: The name of the caller module
     :type caller_module_name: str
+    :param overwrite_policy: How overwrite questions are answered, one of "always", "never" or "prompt". With None,
+        the questions of dependencies asking to be overwritten (`all_overwrite` or `overwrite` in the dependency)
+        are answered with "always", the others with "never".
+    :type overwrite_policy: Optional[str]
     :return: The flow module specification summary
     :rtype: FlowModuleSpecSummary
     """
+    if overwrite_policy is not None and overwrite_policy not in OVERWRITE_POLICIES:
+        raise ValueError(f"overwrite_policy must be one of {OVERWRITE_POLICIES}, got {overwrite_policy}")
+
+    log_prefix = f"{colorama.Fore.GREEN}[{caller_module_name}]{colorama.Style.RESET_ALL}"
+    log_info = logger.isEnabledFor(logging.INFO)
+
     with _lock:
         add_to_sys_path(flow_modules_base_dir)
         add_to_sys_path(os.path.join(flow_modules_base_dir, DEFAULT_FLOW_MODULE_FOLDER))
 
         sync_root = os.path.abspath(os.path.join(flow_modules_base_dir, DEFAULT_FLOW_MODULE_FOLDER))
-        logger.info(
-            f"{colorama.Fore.GREEN}[{caller_module_name}]{colorama.Style.RESET_ALL} started to sync flow module dependencies to {sync_root}..."
-        )
+        if log_info:
+            logger.info(f"{log_prefix} started to sync flow module dependencies to {sync_root}...")
 
-        if not os.path.exists(sync_root):
+        # create first and check afterwards, so that concurrent processes cannot race between the check and mkdir
+        try:
             os.mkdir(sync_root)
+        except FileExistsError:
+            if not stat.S_ISDIR(os.stat(sync_root).st_mode):
+                raise ValueError(f"flow module folder {sync_root} is not a directory")
+        else:
             create_init_py(sync_root)
-        elif not os.path.isdir(sync_root):
-            raise ValueError(f"flow module folder {sync_root} is not a directory")
 
         flow_mod_summary_path = create_empty_flow_mod_file(sync_root, cache_root)
-        flow_mod_summary = FlowModuleSpecSummary.from_flow_mod_file(flow_mod_summary_path)
-        # logger.debug(f"flow mod summary: {flow_mod_summary}")
-
-        for dep in dependencies:
-            dep_is_local = validate_and_augment_dependency(dep, caller_module_name)
-            dep_overwrite = dep.get("overwrite", False)
-            url, revision, mod_name = dep["url"], dep["revision"], dep["mod_name"]
 
-            synced_flow_mod_spec = None
+    # the modules are synced outside of `_lock`, only syncs of the same repo are serialized
+    deps_are_local = [validate_and_augment_dependency(dep, caller_module_name) for dep in dependencies]
+
+    # dependencies of the same repo are synced one after the other in their order, different repos concurrently
+    deps_by_url: Dict[str, List[Tuple[Dict[str, str], bool]]] = {}
+    for dep, dep_is_local in zip(dependencies, deps_are_local):
+        deps_by_url.setdefault(dep["url"], []).append((dep, dep_is_local))
+
+    def _sync_repo_dependencies(url: str, repo_deps: List[Tuple[Dict[str, str], bool]]) -> List[FlowModuleSpec]:
+        repo_synced_flow_mod_specs = []
+        # the repo lock is held from reading the repo's spec in flow.mod until the synced spec is written back,
+        # so that a concurrent sync of the same repo starts from the state this one leaves behind
+        with _lock_for(url):
+            with _lock:
+                flow_mod_summary = FlowModuleSpecSummary.from_flow_mod_file(flow_mod_summary_path)
             previous_synced_flow_mod_spec = flow_mod_summary.get_mod(url)
-            if dep_is_local:
-                synced_flow_mod_spec = sync_local_dep(
-                    previous_synced_flow_mod_spec,
-                    url,
-                    mod_name,
-                    revision,
-                    caller_module_name,
-                    sync_root,
-                    all_overwrite or dep_overwrite,
-                )
-                # logger.debug(f"add local dep {synced_flow_mod_spec} to flow_mod_summary")
-            else:
-                synced_flow_mod_spec = sync_remote_dep(
-                    previous_synced_flow_mod_spec,
-                    url,
-                    mod_name,
-                    revision,
-                    caller_module_name,
-                    sync_root,
-                    cache_root,
-                    all_overwrite or dep_overwrite,
-                )
-                # logger.debug(f"add remote dep {synced_flow_mod_spec} to flow_mod_summary")
-            flow_mod_summary.add_mod(synced_flow_mod_spec)
 
-        # write flow.mod
-        # logger.debug(f"write flow mod summary: {flow_mod_summary}")
-        write_flow_mod_summary(flow_mod_summary_path, flow_mod_summary)
+            for dep, dep_is_local in repo_deps:
+                dep_overwrite = all_overwrite or dep.get("overwrite", False)
+                revision, mod_name = dep["revision"], dep["mod_name"]
+
+                dep_overwrite_policy = overwrite_policy
+                if dep_overwrite_policy is None:
+                    # without a policy, an explicit request to overwrite is not dropped
+                    dep_overwrite_policy = "always" if dep_overwrite else "never"
+
+                synced_flow_mod_spec = None
+                if dep_is_local:
+                    synced_flow_mod_spec = sync_local_dep(
+                        previous_synced_flow_mod_spec,
+                        url,
+                        mod_name,
+                        revision,
+                        caller_module_name,
+                        sync_root,
+                        dep_overwrite,
+                        dep_overwrite_policy,
+                    )
+                    # logger.debug(f"add local dep {synced_flow_mod_spec} to flow_mod_summary")
+                else:
+                    synced_flow_mod_spec = sync_remote_dep(
+                        previous_synced_flow_mod_spec,
+                        url,
+                        mod_name,
+                        revision,
+                        caller_module_name,
+                        sync_root,
+                        cache_root,
+                        dep_overwrite,
+                        dep_overwrite_policy,
+                    )
+                    # logger.debug(f"add remote dep {synced_flow_mod_spec} to flow_mod_summary")
+                previous_synced_flow_mod_spec = synced_flow_mod_spec
+                repo_synced_flow_mod_specs.append(synced_flow_mod_spec)
+
+            with _lock:
+                # flow.mod might have been updated for other repos in the meantime, merge this repo's spec into it
+                flow_mod_summary = FlowModuleSpecSummary.from_flow_mod_file(flow_mod_summary_path)
+                for synced_flow_mod_spec in repo_synced_flow_mod_specs:
+                    flow_mod_summary.add_mod(synced_flow_mod_spec)
+
+                # write flow.mod
+                # logger.debug(f"write flow mod summary: {flow_mod_summary}")
+                write_flow_mod_summary(flow_mod_summary_path, flow_mod_summary)
+        return repo_synced_flow_mod_specs
+
+    if deps_by_url:
+        # syncing is dominated by network and disk I/O
+        with ThreadPoolExecutor(max_workers=min(8, len(deps_by_url))) as executor:
+            futures = [
+                executor.submit(_sync_repo_dependencies, url, repo_deps) for url, repo_deps in deps_by_url.items()
+            ]
+            for future in futures:
+                future.result()
 
-        logger.info(f"{colorama.Fore.GREEN}[{caller_module_name}]{colorama.Style.RESET_ALL} finished syncing\n\n")
-        return flow_mod_summary
+    with _lock:
+        flow_mod_summary = FlowModuleSpecSummary.from_flow_mod_file(flow_mod_summary_path)
+
+    # the synced modules might have been created after the import finders cached their directory listings
+    importlib.invalidate_caches()
+
+    if log_info:
+        logger.info(f"{log_prefix} finished syncing\n\n")
+    return flow_mod_summary
 
 
-def sync_dependencies(dependencies: List[Dict[str, str]], all_overwrite: bool = False) -> List[str]:
+def sync_dependencies(
+    dependencies: List[Dict[str, str]], all_overwrite: bool = False, overwrite_policy: Optional[str] = None
+) -> List[str]:
     """Synchronizes dependencies. (uses the _sync_dependencies function)
 
     :param dependencies: The dependencies to synchronize
     :type dependencies: List[Dict[str, str]]
     :param all_overwrite: Whether to overwrite all existing modules or not
     :type all_overwrite: bool
+    :param overwrite_policy: How overwrite questions (an already synced module is about to be replaced, e.g. because
+        its pinned revision changed or `overwrite` is set) are answered: "always" overwrites, "never" keeps the synced
+        module and "prompt" asks the user. Defaults to "prompt" when running in a terminal or in a Jupyter/IPython
+        kernel. Otherwise (e.g. CI, piped stdin) nobody can answer, so modules asking to be overwritten
+        (`all_overwrite` or `overwrite` in the dependency) are overwritten and all other modules are kept.
+    :type overwrite_policy: Optional[str]
     :return: A list of sync directories
     :rtype: List[str]
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    if caller_module is None:  # https://github.com/epfl-dlab/flows/issues/50
-        caller_module_name = "<interactive>"
-    else:
-        caller_module_name = caller_module.__name__
+    if overwrite_policy is None and _can_prompt_user():
+        overwrite_policy = "prompt"
+
+    # read the name from the caller's globals instead of inspect.getmodule, which scans sys.modules
+    # fall back to "<interactive>" when there is no module name, https://github.com/epfl-dlab/flows/issues/50
+    caller_module_name = sys._getframe(1).f_globals.get("__name__", "<interactive>")
 
     flow_mod_summary = _sync_dependencies(
-        dependencies, all_overwrite, os.curdir, DEFAULT_CACHE_PATH, caller_module_name
+        dependencies, all_overwrite, os.curdir, DEFAULT_CACHE_PATH, caller_module_name, overwrite_policy
     )
 
     return [mod.sync_dir for mod in flow_mod_summary.get_mods()]
@@ -22,8 +22,10 @@ dependencies = [
     {"url": "aiflows/LCToolFlowModule", "revision": "80c0c76181d90846ebff1057b8951d9689f93b62"},
 ]
 
-flow_verse.sync_dependencies(dependencies)
 if __name__ == "__main__":
+    # sync here rather than at import time, so that importing this script does not trigger a sync
+    flow_verse.sync_dependencies(dependencies)
+
     # ~~~ Set the API information ~~~
     # OpenAI backend
     api_information = [ApiInfo(backend_used="openai", api_key=os.getenv("OPENAI_API_KEY"))]